@@ -2,26 +2,14 @@
 
 import streamlit as st
 import pandas as pd
-import re
 import os
 from datetime import datetime
-import xml.etree.ElementTree as ET
 from PIL import Image # Import hinzugefügt, falls es fehlt
-from xml.sax.saxutils import escape as xml_escape
-
-# Mappe von Farbnamen zu CSS-kompatiblen Werten (Hex oder Standardname)
-COLOR_HEX_MAP = {
-    'Blue': '#0074D9', 'Cyan': '#00B8D4', 'Green': '#2ECC40', 
-    'Yellow': '#FFDC00', 'Red': '#FF4136', 'Orange': '#FF851B', 
-    'Magenta': '#FF4136', 'Purple': '#B10DC9', 'Fuchsia': '#F012BE', 
-    'Rose': '#F5B0C4', 'Sky': '#87CEEB', 'Mint': '#98FB98', 
-    'Lemon': '#FFFACD', 'Sand': '#F4A460', 'Cocoa': '#6F4E37', 
-    'White': '#FFFFFF', 'Black': '#000000', 
-    'Denim': '#1560BD'
-}
 
-# Aktualisierte Liste der standardisierten Markerfarben (basiert auf der Map)
-COLOR_OPTIONS = list(COLOR_HEX_MAP.keys())
+from marker_core import (
+    COLOR_HEX_MAP, COLOR_OPTIONS, parse_marker_file, marker_groups, assign_shotids,
+    build_preview_lines, validate_markers, build_exports,
+)
 
 # ---------------------------------------------------------
 # Page Configuration
@@ -346,6 +334,11 @@ with colF:
         help="Clip Markers: Markiert den Clip. Sequence Markers: Markiert die Zeitleiste."
     )
 
+block_on_issues = st.checkbox(
+    "⛔ Block export on validation issues",
+    help="Disables the downloads if duplicate ShotIDs, overlapping or out-of-order markers are found."
+)
+
 st.markdown("---")
 st.markdown("### 🌈 Marker Color Settings")
 
@@ -398,136 +391,6 @@ if st.session_state["override_enable_key"]: # Verwende den aktuellen Zustand der
 
 st.markdown('</div>', unsafe_allow_html=True)
 
-# ---------------------------------------------------------
-# Helper: Timecode → Frames (Unchanged)
-# ---------------------------------------------------------
-def timecode_to_frames(tc: str, fps: float):
-    if not tc or ":" not in tc:
-        return None
-    parts = tc.strip().split(":")
-    if len(parts) != 4:
-        return None
-    try:
-        h = int(parts[0])
-        m = int(parts[1])
-        s = int(parts[2])
-        f = int(parts[3])
-    except ValueError:
-        return None
-    
-    total_seconds = (h * 3600) + (m * 60) + s
-    # Rundung, um float-Fehler bei der Frame-Berechnung zu vermeiden
-    return int(round(total_seconds * fps + f))
-
-# ---------------------------------------------------------
-# XML-Export: Clip-Marker ODER Sequence-Marker (Unchanged)
-# ---------------------------------------------------------
-def generate_premiere_xml(preview_lines, fps: float, seq_name: str, marker_type: str):
-    marker_xml_chunks = []
-    max_frame = 0
-    fps_float = float(fps)
-    
-    timebase_int = round(fps_float) 
-
-    # Marker-Daten sammeln
-    for row in preview_lines:
-        row = row + [""] * (8 - len(row)) if len(row) < 8 else row
-        tc_str   = (row[1] or "").strip()
-        col2     = (row[2] or "").strip()
-        color    = (row[3] or "Cyan").strip() # Wichtig: Nimmt die bereits korrigierte Farbe
-        shotid   = (row[4] or "").strip()
-        col5     = (row[5] or "").strip()
-
-        if not shotid:
-            continue
-
-        if col2.isdigit():
-            frame_in = int(col2)
-        else:
-            frame_in = timecode_to_frames(tc_str, fps_float)
-
-        if frame_in is None:
-            continue
-
-        dur = int(col5) if col5.isdigit() and int(col5) > 0 else 1
-        frame_out = frame_in + dur
-        max_frame = max(max_frame, frame_out)
-
-        comment = col5 if col5 and not col5.isdigit() else shotid
-
-        name_xml    = xml_escape(shotid)
-        comment_xml = xml_escape(comment)
-        color_xml   = xml_escape(color)
-
-        marker_xml_chunks.append(f"""
-                <marker>
-                    <name>{name_xml}</name>
-                    <comment>{comment_xml}</comment>
-                    <in>{frame_in}</in>
-                    <out>{frame_out}</out>
-                    <color>{color_xml}</color>
-                </marker>""")
-
-    duration = max_frame + 1 if marker_xml_chunks else 100
-    duration_str = str(duration)
-    
-    markers_block = "\n".join(marker_xml_chunks)
-    
-    sequence_markers = markers_block if marker_type == "Sequence Markers" else ""
-    clip_markers = markers_block if marker_type == "Clip Markers (Standard)" else ""
-
-    
-    xml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE xmeml>
-<xmeml version="4">
-  <sequence id="sequence-1">
-    <name>{xml_escape(seq_name)}</name>
-    <duration>{duration_str}</duration>
-    <rate>
-      <timebase>{timebase_int}</timebase>
-      <ntsc>FALSE</ntsc>
-    </rate>
-    <media>
-      <video>
-        <track>
-          <clipitem id="clipitem-1">
-            <name>{xml_escape(seq_name)}</name>
-            <enabled>TRUE</enabled>
-            <duration>{duration_str}</duration>
-            <rate>
-              <timebase>{timebase_int}</timebase>
-              <ntsc>FALSE</ntsc>
-            </rate>
-            <start>0</start>
-            <end>{duration_str}</end>
-            <in>0</in>
-            <out>{duration_str}</out>
-            <file id="file-1">
-              <name>{xml_escape(seq_name)}</name>
-              <duration>{duration_str}</duration>
-              <rate>
-                <timebase>{timebase_int}</timebase>
-                <ntsc>FALSE</ntsc>
-              </rate>
-            </file>
-{clip_markers}  </clipitem>
-        </track>
-      </video>
-    </media>
-    <timecode>
-      <rate>
-        <timebase>{timebase_int}</timebase>
-        <ntsc>FALSE</ntsc>
-      </rate>
-      <string>00:00:00:00</string>
-      <frame>0</frame>
-      <displayformat>NDF</displayformat>
-    </timecode>
-{sequence_markers} </sequence>
-</xmeml>
-"""
-    return xml_content
-
 # ---------------------------------------------------------
 # MAIN PROCESSING
 # ---------------------------------------------------------
@@ -535,141 +398,66 @@ if uploaded_file:
     st.markdown('<div class="glass-container">', unsafe_allow_html=True)
     
     try:
-        ext = os.path.splitext(uploaded_file.name)[1].lower()
         base_filename = os.path.splitext(uploaded_file.name)[0]
-        original_lines = []
-
-        # --- IMPORT LOGIC (Unchanged) ---
-        if ext == ".txt":
-            content = uploaded_file.read().decode("utf-8", errors="ignore")
-            for line in content.split("\n"):
-                f = line.strip().split("\t")
-                if any(v.strip() for v in f):
-                    original_lines.append(f)
-
-        elif ext == ".xml":
-            raw = uploaded_file.read()
-            root = ET.fromstring(raw)
-            for marker in root.findall(".//marker"):
-                name = marker.findtext("name") or ""
-                comment = marker.findtext("comment") or ""
-                frame_in = marker.findtext("in") or "0"
-                
-                # Farbwert aus XML auslesen (falls vorhanden, sonst leer)
-                xml_color = marker.findtext("color") or "" 
-                
-                original_lines.append([
-                    "", "", frame_in, xml_color, # Wichtig: XML Farbe wird hier eingefügt
-                    name, comment, "", ""
-                ])
-
-        # --- SHOTID ASSIGNMENT (Unchanged) ---
-        marker_group = []
-        current_group = ""
-        for row in original_lines:
-            text = row[4].strip() if len(row) > 4 else ""
-            m = re.match(r"^(\d{3})\s*-", text)
-            if m:
-                current_group = m.group(1)
-            marker_group.append(current_group)
-
-        group_counter = {}
-        labeled = []
-
-        for i, g in enumerate(marker_group):
-            if not g:
-                labeled.append(original_lines[i][4] if len(original_lines[i]) > 4 else "")
-                continue
-            
-            if g not in group_counter:
-                group_counter[g] = step_size
-                
-            num = group_counter[g]
-            ep = f"{episode}_" if episode else ""
-            shotid = f"{showcode}_{ep}{g}_{str(num).zfill(4)}"
-            labeled.append(shotid)
-            group_counter[g] += step_size
+
+        # --- IMPORT LOGIC (marker_core) ---
+        original_lines = parse_marker_file(uploaded_file.name, uploaded_file.read())
+
+        # --- SHOTID ASSIGNMENT (marker_core) ---
+        labeled = assign_shotids(original_lines, showcode, step_size, episode)
 
         # --- FINAL PREVIEW LINE ASSEMBLY (Color Logic) ---
-        preview_lines = []
         # Den Wert aus dem Session State lesen, da die Checkbox später definiert wurde
         override_active = st.session_state.get("override_enable_key", False) 
-        
-        for i, row in enumerate(original_lines):
-            # Sicherstellen, dass die Zeile mindestens 8 Spalten hat
-            row = row + [""] * (8 - len(row)) if len(row) < 8 else row
-            
-            # 1. Farbe bestimmen (Spalte 3)
-            input_color = (row[3] or "").strip()
-            final_color = default_color # Startwert: Vom Nutzer definierte Standardfarbe
-
-            if override_active:
-                # Override ist aktiv: Erzwinge die gewählte Override-Farbe
-                final_color = override_color
-            elif input_color:
-                # Override ist inaktiv: Wenn die Eingabefarbe gültig ist, übernehme sie
-                if input_color in COLOR_OPTIONS:
-                    final_color = input_color
-                # Wenn die Eingabefarbe ungültig ist, bleibt es bei der 'default_color'
-
-            # 2. Werte zuweisen
-            row[3] = final_color # Wende die finale Farbe an
-            
-            if replace_user and user_value:
-                row[0] = user_value
-            if labeled[i]:
-                row[4] = labeled[i]
-            
-            preview_lines.append(row)
+        preview_lines = build_preview_lines(
+            original_lines, labeled, default_color,
+            override_color=override_color if override_active else "",
+            user_value=user_value if replace_user else "",
+        )
 
 
         # ---------------------------------------------------------
         # PREVIEW + EXPORT DOWNLOAD BUTTONS (Unchanged)
         # ---------------------------------------------------------
+        issues = validate_markers(preview_lines, fps=timebase, groups=marker_groups(original_lines))
+
         st.markdown("### 📊 Data Preview")
-        tab1, tab2 = st.tabs(["📋 Original Data", "✨ Processed Data"])
+        tab1, tab2, tab3 = st.tabs(["📋 Original Data", "✨ Processed Data", f"🔍 Validation ({len(issues)})"])
+        # Tabellen 1-basiert anzeigen, damit "Row" im Validierungs-Tab passt
         with tab1:
-            st.dataframe(original_lines, use_container_width=True)
+            st.dataframe(pd.DataFrame(original_lines, index=range(1, len(original_lines) + 1)), use_container_width=True)
         with tab2:
-            st.dataframe(preview_lines, use_container_width=True)
+            st.dataframe(pd.DataFrame(preview_lines, index=range(1, len(preview_lines) + 1)), use_container_width=True)
+        with tab3:
+            if issues:
+                st.warning(f"⚠️ {len(issues)} validation issue(s) found.")
+                st.dataframe(pd.DataFrame(issues), use_container_width=True, hide_index=True)
+            else:
+                st.success("✅ No duplicate ShotIDs, overlaps or out-of-order markers found.")
 
         st.markdown("---")
         st.markdown("### ⬇️ Export Options")
 
-        # Daten für den Download generieren
-        df = pd.DataFrame(preview_lines)
-        txt = "\n".join(["\t".join(r) for r in preview_lines])
-        csv_c = df.to_csv(index=False)
-        csv_s = df.to_csv(index=False, sep=";")
-
-        timestamp = datetime.now().strftime("%Y%m%d")
-        export_base = f"{base_filename}_processed_{timestamp}"
-        
-        # XML-Export
-        xml_content = generate_premiere_xml(preview_lines, fps=timebase, seq_name=export_base, marker_type=marker_type)
-
-        col_dl1, col_dl2, col_dl3, col_dl4 = st.columns(4)
-
-        with col_dl1:
-            st.download_button("📥 TXT", txt, file_name=f"{export_base}.txt", use_container_width=True)
-
-        with col_dl2:
-            st.download_button("📥 CSV (,)", csv_c, file_name=f"{export_base}_comma.csv", use_container_width=True)
-
-        with col_dl3:
-            st.download_button("📥 CSV (;)", csv_s, file_name=f"{export_base}_semicolon.csv", use_container_width=True)
-
-        with col_dl4:
-            st.download_button(
-                "📥 Premiere XML",
-                xml_content,
-                file_name=f"{export_base}_PremiereMarkers.xml",
-                mime="application/xml",
-                use_container_width=True
-            )
+        if block_on_issues and issues:
+            st.error(f"⛔ Export blocked: {len(issues)} validation issue(s). See the Validation tab.")
+        else:
+            # Daten für den Download generieren
+            timestamp = datetime.now().strftime("%Y%m%d")
+            export_base = f"{base_filename}_processed_{timestamp}"
+            exports = build_exports(preview_lines, export_base, fps=timebase, marker_type=marker_type)
+
+            for col_dl, export in zip(st.columns(len(exports)), exports):
+                with col_dl:
+                    st.download_button(
+                        export.label,
+                        export.data,
+                        file_name=export.file_name,
+                        mime=export.mime,
+                        use_container_width=True
+                    )
+
+            st.success("✅ Processing complete! Download your files above.")
 
-        st.success("✅ Processing complete! Download your files above.")
-        
 
     except Exception as e:
         st.error(f"❌ Processing Error: {e}")
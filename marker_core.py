@@ -0,0 +1,353 @@
+# marker_core.py (VFX ShotID Generator – Import, ShotID- und Export-Logik)
+#
+# Gemeinsame Logik für die Streamlit-App und den Watch-Folder-Dienst.
+
+import re
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from xml.sax.saxutils import escape as xml_escape
+
+import pandas as pd
+
+# Mappe von Farbnamen zu CSS-kompatiblen Werten (Hex oder Standardname)
+COLOR_HEX_MAP = {
+    'Blue': '#0074D9', 'Cyan': '#00B8D4', 'Green': '#2ECC40', 
+    'Yellow': '#FFDC00', 'Red': '#FF4136', 'Orange': '#FF851B', 
+    'Magenta': '#FF4136', 'Purple': '#B10DC9', 'Fuchsia': '#F012BE', 
+    'Rose': '#F5B0C4', 'Sky': '#87CEEB', 'Mint': '#98FB98', 
+    'Lemon': '#FFFACD', 'Sand': '#F4A460', 'Cocoa': '#6F4E37', 
+    'White': '#FFFFFF', 'Black': '#000000', 
+    'Denim': '#1560BD'
+}
+
+# Aktualisierte Liste der standardisierten Markerfarben (basiert auf der Map)
+COLOR_OPTIONS = list(COLOR_HEX_MAP.keys())
+
+# ---------------------------------------------------------
+# Import: Avid TXT / Premiere XML → Zeilen
+# ---------------------------------------------------------
+def parse_marker_file(filename: str, raw: bytes):
+    """Liest den Inhalt einer Marker-Datei (.txt oder .xml) in eine Liste von Zeilen ein."""
+    ext = os.path.splitext(filename)[1].lower()
+    original_lines = []
+
+    if ext == ".txt":
+        content = raw.decode("utf-8", errors="ignore")
+        for line in content.split("\n"):
+            f = line.strip().split("\t")
+            if any(v.strip() for v in f):
+                original_lines.append(f)
+
+    elif ext == ".xml":
+        root = ET.fromstring(raw)
+        for marker in root.findall(".//marker"):
+            name = marker.findtext("name") or ""
+            comment = marker.findtext("comment") or ""
+            frame_in = marker.findtext("in") or "0"
+
+            # Farbwert aus XML auslesen (falls vorhanden, sonst leer)
+            xml_color = marker.findtext("color") or ""
+
+            original_lines.append([
+                "", "", frame_in, xml_color, # Wichtig: XML Farbe wird hier eingefügt
+                name, comment, "", ""
+            ])
+
+    return original_lines
+
+# ---------------------------------------------------------
+# ShotID-Vergabe
+# ---------------------------------------------------------
+def marker_groups(original_lines):
+    """Ermittelt für jede Zeile den aktuellen Gruppencode ("" vor dem ersten "NNN -")."""
+    marker_group = []
+    current_group = ""
+    for row in original_lines:
+        text = row[4].strip() if len(row) > 4 else ""
+        m = re.match(r"^(\d{3})\s*-", text)
+        if m:
+            current_group = m.group(1)
+        marker_group.append(current_group)
+    return marker_group
+
+def assign_shotids(original_lines, showcode: str, step_size: int, episode: str = ""):
+    """Vergibt pro Gruppencode (z.B. "010 - ...") fortlaufende ShotIDs."""
+    marker_group = marker_groups(original_lines)
+
+    group_counter = {}
+    labeled = []
+
+    for i, g in enumerate(marker_group):
+        if not g:
+            labeled.append(original_lines[i][4] if len(original_lines[i]) > 4 else "")
+            continue
+
+        if g not in group_counter:
+            group_counter[g] = step_size
+
+        num = group_counter[g]
+        ep = f"{episode}_" if episode else ""
+        shotid = f"{showcode}_{ep}{g}_{str(num).zfill(4)}"
+        labeled.append(shotid)
+        group_counter[g] += step_size
+
+    return labeled
+
+# ---------------------------------------------------------
+# Vorschau-Zeilen (Farb-Logik, Username, ShotIDs)
+# ---------------------------------------------------------
+def build_preview_lines(original_lines, labeled, default_color: str, override_color: str = "", user_value: str = ""):
+    """Setzt Farbe, Username und ShotID in jede Zeile ein (override_color leer = kein Override)."""
+    preview_lines = []
+
+    for i, row in enumerate(original_lines):
+        # Sicherstellen, dass die Zeile mindestens 8 Spalten hat
+        row = row + [""] * (8 - len(row)) if len(row) < 8 else row
+
+        # 1. Farbe bestimmen (Spalte 3)
+        input_color = (row[3] or "").strip()
+        final_color = default_color # Startwert: Vom Nutzer definierte Standardfarbe
+
+        if override_color:
+            # Override ist aktiv: Erzwinge die gewählte Override-Farbe
+            final_color = override_color
+        elif input_color:
+            # Override ist inaktiv: Wenn die Eingabefarbe gültig ist, übernehme sie
+            if input_color in COLOR_OPTIONS:
+                final_color = input_color
+            # Wenn die Eingabefarbe ungültig ist, bleibt es bei der 'default_color'
+
+        # 2. Werte zuweisen
+        row[3] = final_color # Wende die finale Farbe an
+
+        if user_value:
+            row[0] = user_value
+        if labeled[i]:
+            row[4] = labeled[i]
+
+        preview_lines.append(row)
+
+    return preview_lines
+
+# ---------------------------------------------------------
+# Helper: Timecode → Frames (Unchanged)
+# ---------------------------------------------------------
+def timecode_to_frames(tc: str, fps: float):
+    if not tc or ":" not in tc:
+        return None
+    parts = tc.strip().split(":")
+    if len(parts) != 4:
+        return None
+    try:
+        h = int(parts[0])
+        m = int(parts[1])
+        s = int(parts[2])
+        f = int(parts[3])
+    except ValueError:
+        return None
+    
+    total_seconds = (h * 3600) + (m * 60) + s
+    # Rundung, um float-Fehler bei der Frame-Berechnung zu vermeiden
+    return int(round(total_seconds * fps + f))
+
+# ---------------------------------------------------------
+# Helper: Marker-Zeile → (frame_in, frame_out)
+# ---------------------------------------------------------
+def marker_frame_range(row, fps: float):
+    """Berechnet den Frame-Bereich eines Markers wie im XML-Export (None, falls ungültig)."""
+    row = row + [""] * (8 - len(row)) if len(row) < 8 else row
+    tc_str = (row[1] or "").strip()
+    col2   = (row[2] or "").strip()
+    col5   = (row[5] or "").strip()
+
+    if col2.isdigit():
+        frame_in = int(col2)
+    else:
+        frame_in = timecode_to_frames(tc_str, fps)
+
+    if frame_in is None:
+        return None
+
+    dur = int(col5) if col5.isdigit() and int(col5) > 0 else 1
+    return frame_in, frame_in + dur
+
+# ---------------------------------------------------------
+# XML-Export: Clip-Marker ODER Sequence-Marker (Unchanged)
+# ---------------------------------------------------------
+def generate_premiere_xml(preview_lines, fps: float, seq_name: str, marker_type: str):
+    marker_xml_chunks = []
+    max_frame = 0
+    fps_float = float(fps)
+    
+    timebase_int = round(fps_float) 
+
+    # Marker-Daten sammeln
+    for row in preview_lines:
+        row = row + [""] * (8 - len(row)) if len(row) < 8 else row
+        color    = (row[3] or "Cyan").strip() # Wichtig: Nimmt die bereits korrigierte Farbe
+        shotid   = (row[4] or "").strip()
+        col5     = (row[5] or "").strip()
+
+        if not shotid:
+            continue
+
+        frame_range = marker_frame_range(row, fps_float)
+        if frame_range is None:
+            continue
+
+        frame_in, frame_out = frame_range
+        max_frame = max(max_frame, frame_out)
+
+        comment = col5 if col5 and not col5.isdigit() else shotid
+
+        name_xml    = xml_escape(shotid)
+        comment_xml = xml_escape(comment)
+        color_xml   = xml_escape(color)
+
+        marker_xml_chunks.append(f"""
+                <marker>
+                    <name>{name_xml}</name>
+                    <comment>{comment_xml}</comment>
+                    <in>{frame_in}</in>
+                    <out>{frame_out}</out>
+                    <color>{color_xml}</color>
+                </marker>""")
+
+    duration = max_frame + 1 if marker_xml_chunks else 100
+    duration_str = str(duration)
+    
+    markers_block = "\n".join(marker_xml_chunks)
+    
+    sequence_markers = markers_block if marker_type == "Sequence Markers" else ""
+    clip_markers = markers_block if marker_type == "Clip Markers (Standard)" else ""
+
+    
+    xml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE xmeml>
+<xmeml version="4">
+  <sequence id="sequence-1">
+    <name>{xml_escape(seq_name)}</name>
+    <duration>{duration_str}</duration>
+    <rate>
+      <timebase>{timebase_int}</timebase>
+      <ntsc>FALSE</ntsc>
+    </rate>
+    <media>
+      <video>
+        <track>
+          <clipitem id="clipitem-1">
+            <name>{xml_escape(seq_name)}</name>
+            <enabled>TRUE</enabled>
+            <duration>{duration_str}</duration>
+            <rate>
+              <timebase>{timebase_int}</timebase>
+              <ntsc>FALSE</ntsc>
+            </rate>
+            <start>0</start>
+            <end>{duration_str}</end>
+            <in>0</in>
+            <out>{duration_str}</out>
+            <file id="file-1">
+              <name>{xml_escape(seq_name)}</name>
+              <duration>{duration_str}</duration>
+              <rate>
+                <timebase>{timebase_int}</timebase>
+                <ntsc>FALSE</ntsc>
+              </rate>
+            </file>
+{clip_markers}  </clipitem>
+        </track>
+      </video>
+    </media>
+    <timecode>
+      <rate>
+        <timebase>{timebase_int}</timebase>
+        <ntsc>FALSE</ntsc>
+      </rate>
+      <string>00:00:00:00</string>
+      <frame>0</frame>
+      <displayformat>NDF</displayformat>
+    </timecode>
+{sequence_markers} </sequence>
+</xmeml>
+"""
+    return xml_content
+
+# ---------------------------------------------------------
+# Validierung: doppelte ShotIDs, Überlappungen, Reihenfolge
+# ---------------------------------------------------------
+def validate_markers(preview_lines, fps: float, groups=None):
+    """Prüft die Marker in O(n log n) und gibt eine Liste gefundener Probleme zurück.
+
+    "Row" ist 1-basiert und entspricht dem Index der Vorschau-Tabellen.
+    groups (aus marker_groups) begrenzt die Duplikat-Prüfung auf generierte ShotIDs;
+    Zeilen ohne Gruppencode tragen nur ihren Kommentar und werden dort ignoriert.
+    Da assign_shotids pro Gruppe weiterzählt, ist die Duplikat-Prüfung für dessen
+    Ausgabe nur ein Sicherheitsnetz (z.B. für nachträglich bearbeitete Zeilen).
+    """
+    issues = []
+    shotid_index = {}   # Hash-Index: ShotID -> Zeilennummern
+    intervals = []      # (frame_in, frame_out, zeile, shotid)
+    prev_in, prev_line = None, None
+
+    for i, row in enumerate(preview_lines):
+        shotid = (row[4] if len(row) > 4 else "").strip()
+        if not shotid:
+            continue
+        if groups is None or groups[i]:
+            shotid_index.setdefault(shotid, []).append(i + 1)
+
+        frame_range = marker_frame_range(row, fps)
+        if frame_range is None:
+            continue
+        frame_in, frame_out = frame_range
+
+        # Timecodes sollten in Dateireihenfolge aufsteigend sein
+        if prev_in is not None and frame_in < prev_in:
+            issues.append({
+                "Type": "Out of order", "Row": i + 1, "ShotID": shotid,
+                "Details": f"Frame {frame_in} comes before frame {prev_in} (row {prev_line})",
+            })
+        prev_in, prev_line = frame_in, i + 1
+        intervals.append((frame_in, frame_out, i + 1, shotid))
+
+    for shotid, lines in shotid_index.items():
+        if len(lines) > 1:
+            issues.append({
+                "Type": "Duplicate ShotID", "Row": lines[1], "ShotID": shotid,
+                "Details": f"Used on rows {', '.join(str(n) for n in lines)}",
+            })
+
+    # Sortierter Intervall-Index: ein Sweep gegen das bisher am weitesten reichende Intervall
+    intervals.sort()
+    reach = None
+    for frame_in, frame_out, line, shotid in intervals:
+        if reach is not None and frame_in < reach[0]:
+            issues.append({
+                "Type": "Overlap", "Row": line, "ShotID": shotid,
+                "Details": f"Frames {frame_in}-{frame_out} overlap {reach[2]} (row {reach[1]}, ends at {reach[0]})",
+            })
+        if reach is None or frame_out > reach[0]:
+            reach = (frame_out, line, shotid)
+
+    issues.sort(key=lambda issue: issue["Row"])
+    return issues
+
+
+# ---------------------------------------------------------
+# Export: TXT, CSV (, / ;) und Premiere XML
+# ---------------------------------------------------------
+# Eine Export-Datei: Button-Beschriftung, Dateiname, Inhalt, MIME-Typ (None = Streamlit-Standard)
+ExportFile = namedtuple("ExportFile", ["label", "file_name", "data", "mime"])
+
+def build_exports(preview_lines, export_base: str, fps: float, marker_type: str):
+    """Erzeugt alle Export-Dateien als Liste von ExportFile (TXT, CSV (,), CSV (;), Premiere XML)."""
+    df = pd.DataFrame(preview_lines)
+    xml_content = generate_premiere_xml(preview_lines, fps=fps, seq_name=export_base, marker_type=marker_type)
+    return [
+        ExportFile("📥 TXT", f"{export_base}.txt", "\n".join(["\t".join(r) for r in preview_lines]), None),
+        ExportFile("📥 CSV (,)", f"{export_base}_comma.csv", df.to_csv(index=False), None),
+        ExportFile("📥 CSV (;)", f"{export_base}_semicolon.csv", df.to_csv(index=False, sep=";"), None),
+        ExportFile("📥 Premiere XML", f"{export_base}_PremiereMarkers.xml", xml_content, "application/xml"),
+    ]
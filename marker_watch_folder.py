@@ -0,0 +1,311 @@
+# marker_watch_folder.py (VFX ShotID Generator – Watch-Folder-Dienst)
+#
+# Überwacht einen Ordner auf neue oder geänderte Avid TXT / Premiere XML Marker-Dateien
+# und schreibt die TXT/CSV/Premiere-XML-Exporte direkt daneben.
+#
+# Beispiel:
+#   python marker_watch_folder.py /mnt/share/markers --showcode ABCDE --episode E01 --fps 25
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock, get_ident
+
+from marker_core import (
+    COLOR_OPTIONS, parse_marker_file, marker_groups, assign_shotids,
+    build_preview_lines, validate_markers, build_exports,
+)
+
+STATE_FILENAME = ".shotid_watch_state.json"
+STATS_FILENAME = ".shotid_watch_stats.json"
+WATCH_EXTENSIONS = (".txt", ".xml")
+# Eigene Exporte (z.B. "reel1_processed_20250101_PremiereMarkers.xml") nicht erneut verarbeiten
+OUTPUT_PATTERN = re.compile(r"_processed_\d{8}(_PremiereMarkers|_comma|_semicolon)?$")
+LATENCY_HISTORY = 50
+
+log = logging.getLogger("shotid_watch")
+
+
+# ---------------------------------------------------------
+# Helper: Atomar schreiben (keine halben Dateien für Premiere/Avid)
+# ---------------------------------------------------------
+def write_atomic(path: str, content: str):
+    tmp_path = f"{path}.{get_ident()}.part"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as fh:
+        fh.write(content)
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------
+# Watch-Folder
+# ---------------------------------------------------------
+class WatchFolder:
+    """Pollt einen Ordner, entprellt Schreibvorgänge und verarbeitet Dateien in einem begrenzten Worker-Pool."""
+
+    def __init__(self, folder: str, settings: dict, debounce: float = 2.0, interval: float = 1.0, workers: int = 2):
+        self.folder = os.path.abspath(folder)
+        self.settings = settings
+        self.debounce = debounce
+        self.interval = interval
+        self.workers = workers
+
+        self.state_path = os.path.join(self.folder, STATE_FILENAME)
+        self.stats_path = os.path.join(self.folder, STATS_FILENAME)
+
+        self.lock = Lock()
+        self.state_lock = Lock()     # Serialisiert Snapshot + Ersetzen der State-Datei
+        self.settings_key = json.dumps(settings, sort_keys=True)
+        self.processed_keys = self._load_state()
+        self.claimed_keys = set()    # Job-Keys, die gerade von einem Worker verarbeitet werden
+        self.pending = {}        # Pfad -> (Signatur, Zeitpunkt der letzten Änderung)
+        self.handled = {}        # Pfad -> zuletzt eingereihte Signatur
+        self.ready = deque()     # (Pfad, Signatur, Erkennungszeitpunkt), wartet auf einen freien Worker
+        self.running = set()
+        self.stats = {"processed": 0, "skipped": 0, "blocked": 0, "failed": 0}
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+
+    # --- STATE (bereits verarbeitete Dateien per Job-Key) ---
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as fh:
+                return json.load(fh).get("processed", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        # Snapshot und Replace unter einem Lock, sonst kann ein älterer Snapshot einen neueren überschreiben
+        with self.state_lock:
+            with self.lock:
+                payload = json.dumps({"processed": self.processed_keys}, indent=2)
+            write_atomic(self.state_path, payload)
+
+    def job_key(self, name: str, raw: bytes):
+        """Inhalt, Dateiname und Export-Einstellungen bestimmen, ob eine Datei neu exportiert werden muss."""
+        digest = hashlib.sha256(raw)
+        digest.update(b"\0" + name.encode("utf-8") + b"\0" + self.settings_key.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _outputs_exist(self, key: str):
+        entry = self.processed_keys.get(key)
+        return bool(entry) and all(os.path.exists(os.path.join(self.folder, f)) for f in entry["outputs"])
+
+    def export_base(self, name: str):
+        """Basisname der Exporte; bei gleichnamigen Quellen (reel1.txt + reel1.xml) mit Endung."""
+        stem, ext = os.path.splitext(name)
+        collides = any(
+            entry.name != name and os.path.splitext(entry.name)[0] == stem
+            for entry in self._candidates()
+        )
+        base = f"{stem}_{ext[1:]}" if collides else stem
+        return f"{base}_processed_{datetime.now().strftime('%Y%m%d')}"
+
+    def _write_stats(self):
+        with self.lock:
+            payload = json.dumps({
+                "updated": datetime.now().isoformat(timespec="seconds"),
+                "queue_depth": len(self.ready),
+                "in_flight": len(self.running),
+                "debouncing": len(self.pending),
+                **self.stats,
+                "recent_files": list(self.latencies),
+            }, indent=2)
+        write_atomic(self.stats_path, payload)
+
+    # --- SCAN + DEBOUNCE ---
+    def _candidates(self):
+        for entry in os.scandir(self.folder):
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() not in WATCH_EXTENSIONS or entry.name.startswith("."):
+                continue
+            if OUTPUT_PATTERN.search(stem) or not entry.is_file():
+                continue
+            yield entry
+
+    def scan(self):
+        now = time.monotonic()
+        seen = set()
+        for entry in self._candidates():
+            try:
+                info = entry.stat()
+            except OSError:
+                continue
+            path = entry.path
+            seen.add(path)
+            signature = (info.st_mtime_ns, info.st_size)
+
+            if self.handled.get(path) == signature:
+                continue
+            previous = self.pending.get(path)
+            if previous is None or previous[0] != signature:
+                # Neu oder noch in Bearbeitung: Timer (neu) starten
+                self.pending[path] = (signature, now)
+            elif now - previous[1] >= self.debounce:
+                # Größe/mtime stabil über die Debounce-Zeit: Datei ist fertig geschrieben
+                del self.pending[path]
+                self.handled[path] = signature
+                self.ready.append((path, signature, previous[1]))
+
+        # Verschwundene Dateien vergessen (auch in handled, sonst wächst es endlos und
+        # eine neu angelegte Datei mit gleicher mtime/Größe würde ignoriert)
+        for tracked in (self.pending, self.handled):
+            for path in list(tracked):
+                if path not in seen:
+                    del tracked[path]
+
+    # --- VERARBEITUNG ---
+    def process_file(self, path: str):
+        started = time.monotonic()
+        name = os.path.basename(path)
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        key = self.job_key(name, raw)
+
+        with self.lock:
+            already_done = key in self.claimed_keys or self._outputs_exist(key)
+            if not already_done:
+                self.claimed_keys.add(key)
+        if already_done:
+            return "skipped", [], started
+
+        try:
+            return self._export(name, raw, key, started)
+        finally:
+            with self.lock:
+                self.claimed_keys.discard(key)
+
+    def _export(self, name: str, raw: bytes, key: str, started: float):
+        s = self.settings
+        original_lines = parse_marker_file(name, raw)
+        labeled = assign_shotids(original_lines, s["showcode"], s["step_size"], s["episode"])
+        preview_lines = build_preview_lines(
+            original_lines, labeled, s["default_color"],
+            override_color=s["override_color"], user_value=s["user_value"],
+        )
+
+        issues = validate_markers(preview_lines, fps=s["timebase"], groups=marker_groups(original_lines))
+        for issue in issues:
+            log.warning("%s row %s: %s %s – %s", name, issue["Row"], issue["Type"], issue["ShotID"], issue["Details"])
+        if issues and s["block_on_issues"]:
+            return "blocked", issues, started
+
+        exports = build_exports(preview_lines, self.export_base(name), fps=s["timebase"], marker_type=s["marker_type"])
+        for export in exports:
+            write_atomic(os.path.join(self.folder, export.file_name), export.data)
+
+        with self.lock:
+            # Nur den neuesten Key pro Quelldatei behalten, damit der State nicht endlos wächst
+            for old_key in [k for k, entry in self.processed_keys.items() if entry["source"] == name]:
+                del self.processed_keys[old_key]
+            self.processed_keys[key] = {"source": name, "outputs": [export.file_name for export in exports]}
+        self._save_state()
+        return "processed", issues, started
+
+    def _run_job(self, path: str, detected_at: float):
+        try:
+            status, issues, started = self.process_file(path)
+        except Exception as e:
+            log.error("❌ %s: %s", os.path.basename(path), e)
+            status, issues, started = "failed", [], time.monotonic()
+
+        finished = time.monotonic()
+        with self.lock:
+            self.running.discard(path)
+            self.stats[status] += 1
+            self.latencies.append({
+                "file": os.path.basename(path),
+                "status": status,
+                "issues": len(issues),
+                "processing_s": round(finished - started, 3),
+                "latency_s": round(finished - detected_at, 3),
+            })
+        log.info("%s: %s (%d issue(s))", os.path.basename(path), status, len(issues))
+        self._write_stats()
+
+    def dispatch(self, pool: ThreadPoolExecutor):
+        # Nie mehr Jobs abgeben als Worker frei sind – der Rest bleibt in der Queue
+        for _ in range(len(self.ready)):
+            with self.lock:
+                if len(self.running) >= self.workers:
+                    return
+                path, signature, detected_at = self.ready.popleft()
+                if path in self.running:
+                    # Datei wird noch verarbeitet: hinten anstellen und mit dem Rest weitermachen
+                    self.ready.append((path, signature, detected_at))
+                    continue
+                self.running.add(path)
+            pool.submit(self._run_job, path, detected_at)
+
+    def poll_once(self, pool: ThreadPoolExecutor):
+        # Netzlaufwerk kurz weg, EACCES/ENOSPC beim Stats-Schreiben: loggen und im nächsten Intervall erneut versuchen
+        try:
+            self.scan()
+            self.dispatch(pool)
+            self._write_stats()
+        except OSError as e:
+            log.error("❌ Polling %s failed: %s", self.folder, e)
+
+    def run(self):
+        log.info("👀 Watching %s (debounce %.1fs, %d worker(s))", self.folder, self.debounce, self.workers)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while True:
+                    self.poll_once(pool)
+                    time.sleep(self.interval)
+            except KeyboardInterrupt:
+                log.info("Stopping watcher, waiting for running jobs…")
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a folder for Avid/Premiere marker files and export ShotIDs next to them.")
+    parser.add_argument("folder", help="Folder to watch")
+    parser.add_argument("--showcode", default="ABCDE", help="SHOWCODE (max 5 chars)")
+    parser.add_argument("--step-size", type=int, default=10, help="ShotID increments")
+    parser.add_argument("--episode", default="", help="Episode code, e.g. E01")
+    parser.add_argument("--user", default="", help="Replace username in column 1")
+    parser.add_argument("--fps", type=float, default=24, help="Timebase for XML export")
+    parser.add_argument("--sequence-markers", action="store_true", help="Export Sequence Markers instead of Clip Markers")
+    parser.add_argument("--default-color", default="Green", choices=COLOR_OPTIONS, help="Color for markers without a valid color")
+    parser.add_argument("--override-color", default="", choices=[""] + COLOR_OPTIONS, help="Force all markers to one color")
+    parser.add_argument("--block-on-issues", action="store_true", help="Skip the export if validation finds issues")
+    parser.add_argument("--debounce", type=float, default=2.0, help="Seconds a file must stay unchanged before processing")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds")
+    parser.add_argument("--workers", type=int, default=2, help="Maximum number of files processed in parallel")
+    args = parser.parse_args(argv)
+
+    if args.showcode and len(args.showcode) > 5:
+        parser.error("--showcode must be at most 5 characters")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.step_size < 1:
+        parser.error("--step-size must be at least 1")
+    if args.fps <= 0:
+        parser.error("--fps must be greater than 0")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    settings = {
+        "showcode": args.showcode.upper(),
+        "step_size": args.step_size,
+        "episode": args.episode.upper(),
+        "user_value": args.user.strip(),
+        "timebase": args.fps,
+        "marker_type": "Sequence Markers" if args.sequence_markers else "Clip Markers (Standard)",
+        "default_color": args.default_color,
+        "override_color": args.override_color,
+        "block_on_issues": args.block_on_issues,
+    }
+    WatchFolder(args.folder, settings, debounce=args.debounce, interval=args.interval, workers=args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
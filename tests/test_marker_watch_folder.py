@@ -0,0 +1,263 @@
+import json
+import os
+
+import pytest
+
+import marker_watch_folder
+from marker_watch_folder import STATE_FILENAME, WatchFolder, main
+
+MARKERS = "user\t00:00:01:00\t\tRed\t010 - explosion\t5\nuser\t00:00:02:00\t\t\t010 - more\t\n"
+
+SETTINGS = {
+    "showcode": "ABCDE",
+    "step_size": 10,
+    "episode": "",
+    "user_value": "",
+    "timebase": 25,
+    "marker_type": "Clip Markers (Standard)",
+    "default_color": "Green",
+    "override_color": "",
+    "block_on_issues": False,
+}
+
+
+class FakePool:
+    """Merkt sich abgegebene Jobs, statt sie auszuführen."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, path, detected_at):
+        self.submitted.append(path)
+
+
+def write(folder, name, content=MARKERS):
+    path = folder / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def make_watcher(folder, workers=2, **overrides):
+    return WatchFolder(str(folder), {**SETTINGS, **overrides}, debounce=0, workers=workers)
+
+
+def ready_paths(watcher):
+    return [path for path, _, _ in watcher.ready]
+
+
+def outputs(folder):
+    return sorted(name for name in os.listdir(folder) if "_processed_" in name)
+
+
+def test_scan_debounces_until_file_is_stable(tmp_path):
+    watcher = make_watcher(tmp_path)
+    watcher.debounce = 60
+    path = write(tmp_path, "reel1.txt")
+
+    watcher.scan()
+    watcher.scan()
+    assert list(watcher.ready) == []
+    assert path in watcher.pending
+
+    watcher.debounce = 0
+    watcher.scan()
+    assert ready_paths(watcher) == [path]
+    assert watcher.pending == {}
+
+
+def test_scan_requeues_changed_file_only(tmp_path):
+    watcher = make_watcher(tmp_path)
+    path = write(tmp_path, "reel1.txt")
+    watcher.scan()
+    watcher.scan()
+    watcher.ready.clear()
+
+    # Unveränderte Datei wird nicht erneut eingereiht
+    watcher.scan()
+    watcher.scan()
+    assert list(watcher.ready) == []
+
+    write(tmp_path, "reel1.txt", MARKERS + "user\t00:00:03:00\t\t\t010 - last\t\n")
+    watcher.scan()
+    watcher.scan()
+    assert ready_paths(watcher) == [path]
+
+
+def test_scan_ignores_own_outputs_and_hidden_files(tmp_path):
+    watcher = make_watcher(tmp_path)
+    write(tmp_path, "reel1_processed_20250101.txt")
+    write(tmp_path, "reel1_processed_20250101_PremiereMarkers.xml")
+    write(tmp_path, ".hidden.txt")
+    watcher.scan()
+    watcher.scan()
+    assert list(watcher.ready) == []
+
+
+def test_process_file_writes_outputs_and_skips_unchanged(tmp_path):
+    watcher = make_watcher(tmp_path)
+    path = write(tmp_path, "reel1.txt")
+
+    status, issues, _ = watcher.process_file(path)
+    assert (status, issues) == ("processed", [])
+    assert len(outputs(tmp_path)) == 4
+    txt = [name for name in outputs(tmp_path) if name.endswith(".txt")][0]
+    assert "ABCDE_010_0010" in (tmp_path / txt).read_text(encoding="utf-8")
+
+    assert watcher.process_file(path)[0] == "skipped"
+
+
+def test_changed_file_is_reprocessed(tmp_path):
+    watcher = make_watcher(tmp_path)
+    path = write(tmp_path, "reel1.txt")
+    assert watcher.process_file(path)[0] == "processed"
+
+    write(tmp_path, "reel1.txt", MARKERS + "user\t00:00:03:00\t\t\t010 - last\t\n")
+    assert watcher.process_file(path)[0] == "processed"
+
+
+def test_renamed_duplicate_gets_its_own_outputs(tmp_path):
+    watcher = make_watcher(tmp_path)
+    assert watcher.process_file(write(tmp_path, "reel1.txt"))[0] == "processed"
+    assert watcher.process_file(write(tmp_path, "reel2.txt"))[0] == "processed"
+    assert len([name for name in outputs(tmp_path) if name.startswith("reel2_")]) == 4
+
+
+def test_settings_change_reprocesses_after_restart(tmp_path):
+    path = write(tmp_path, "reel1.txt")
+    assert make_watcher(tmp_path).process_file(path)[0] == "processed"
+    assert make_watcher(tmp_path).process_file(path)[0] == "skipped"
+
+    assert make_watcher(tmp_path, showcode="ZZZ").process_file(path)[0] == "processed"
+    txt = [name for name in outputs(tmp_path) if name.endswith(".txt")][0]
+    assert "ZZZ_010_0010" in (tmp_path / txt).read_text(encoding="utf-8")
+
+
+def test_missing_outputs_are_recreated(tmp_path):
+    watcher = make_watcher(tmp_path)
+    path = write(tmp_path, "reel1.txt")
+    watcher.process_file(path)
+    for name in outputs(tmp_path):
+        os.remove(tmp_path / name)
+
+    assert watcher.process_file(path)[0] == "processed"
+    assert len(outputs(tmp_path)) == 4
+
+
+def test_same_stem_sources_do_not_overwrite_each_other(tmp_path):
+    watcher = make_watcher(tmp_path)
+    xml = ('<xmeml><marker><name>010 - a</name><comment></comment><in>5</in>'
+           '<color>Red</color></marker></xmeml>')
+    txt_path, xml_path = write(tmp_path, "reel1.txt"), write(tmp_path, "reel1.xml", xml)
+    assert watcher.process_file(txt_path)[0] == "processed"
+    assert watcher.process_file(xml_path)[0] == "processed"
+
+    names = outputs(tmp_path)
+    assert len(names) == 8
+    assert any(name.startswith("reel1_txt_processed_") for name in names)
+    assert any(name.startswith("reel1_xml_processed_") for name in names)
+
+
+def test_blocked_file_writes_no_outputs(tmp_path):
+    watcher = make_watcher(tmp_path, block_on_issues=True)
+    overlapping = "user\t00:00:01:00\t\t\t010 - a\t5\nuser\t00:00:01:02\t\t\t010 - b\t\n"
+    status, issues, _ = watcher.process_file(write(tmp_path, "reel1.txt", overlapping))
+    assert status == "blocked"
+    assert [issue["Type"] for issue in issues] == ["Overlap"]
+    assert outputs(tmp_path) == []
+
+
+def test_state_survives_restart(tmp_path):
+    watcher = make_watcher(tmp_path)
+    watcher.process_file(write(tmp_path, "reel1.txt"))
+    with open(tmp_path / STATE_FILENAME, encoding="utf-8") as fh:
+        state = json.load(fh)["processed"]
+    assert [entry["source"] for entry in state.values()] == ["reel1.txt"]
+
+
+def test_dispatch_respects_worker_limit(tmp_path):
+    watcher = make_watcher(tmp_path, workers=2)
+    watcher.ready.extend((f"/x/{n}.txt", None, 0.0) for n in "abc")
+    pool = FakePool()
+
+    watcher.dispatch(pool)
+    assert pool.submitted == ["/x/a.txt", "/x/b.txt"]
+    assert ready_paths(watcher) == ["/x/c.txt"]
+
+
+def test_dispatch_skips_running_path_without_stalling_queue(tmp_path):
+    watcher = make_watcher(tmp_path, workers=2)
+    watcher.running.add("/x/a.txt")
+    watcher.ready.extend((f"/x/{n}.txt", None, 0.0) for n in "ab")
+    pool = FakePool()
+
+    watcher.dispatch(pool)
+    assert pool.submitted == ["/x/b.txt"]
+    assert ready_paths(watcher) == ["/x/a.txt"]
+
+
+def test_deleted_file_is_forgotten_and_recreated_file_requeued(tmp_path):
+    watcher = make_watcher(tmp_path)
+    path = write(tmp_path, "reel1.txt")
+    info = os.stat(path)
+    watcher.scan()
+    watcher.scan()
+    watcher.ready.clear()
+
+    os.remove(path)
+    watcher.scan()
+    assert watcher.handled == {}
+
+    # Gleiche mtime und Größe wie vorher
+    write(tmp_path, "reel1.txt")
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns))
+    watcher.scan()
+    watcher.scan()
+    assert ready_paths(watcher) == [path]
+
+
+def test_state_keeps_only_latest_key_per_source(tmp_path):
+    watcher = make_watcher(tmp_path)
+    path = write(tmp_path, "reel1.txt")
+    watcher.process_file(path)
+    write(tmp_path, "reel1.txt", MARKERS + "user\t00:00:03:00\t\t\t010 - last\t\n")
+    watcher.process_file(path)
+    watcher.process_file(write(tmp_path, "reel2.txt"))
+
+    with open(tmp_path / STATE_FILENAME, encoding="utf-8") as fh:
+        state = json.load(fh)["processed"]
+    assert sorted(entry["source"] for entry in state.values()) == ["reel1.txt", "reel2.txt"]
+
+
+def test_poll_survives_folder_error(tmp_path, monkeypatch):
+    watcher = make_watcher(tmp_path)
+    path = write(tmp_path, "reel1.txt")
+    real_scandir = os.scandir
+    calls = []
+
+    def flaky_scandir(folder):
+        calls.append(folder)
+        if len(calls) == 1:
+            raise OSError("share unavailable")
+        return real_scandir(folder)
+
+    monkeypatch.setattr(marker_watch_folder.os, "scandir", flaky_scandir)
+    pool = FakePool()
+    watcher.poll_once(pool)
+    assert pool.submitted == []
+
+    watcher.poll_once(pool)
+    watcher.poll_once(pool)
+    assert pool.submitted == [path]
+
+
+@pytest.mark.parametrize("args", [
+    ["--step-size", "0"],
+    ["--step-size=-10"],
+    ["--fps", "0"],
+    ["--fps=-25"],
+])
+def test_cli_rejects_invalid_step_size_and_fps(tmp_path, capsys, args):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path), *args])
+    assert exc.value.code == 2
+    assert "must be" in capsys.readouterr().err
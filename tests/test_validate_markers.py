@@ -0,0 +1,78 @@
+from marker_core import assign_shotids, build_preview_lines, marker_groups, validate_markers
+
+
+def row(frame, shotid, dur=""):
+    return ["user", "", str(frame), "Green", shotid, str(dur), "", ""]
+
+
+def types(issues):
+    return [issue["Type"] for issue in issues]
+
+
+def test_clean_markers_have_no_issues():
+    lines = [row(0, "A_010_0010"), row(10, "A_010_0020"), row(20, "A_020_0010")]
+    assert validate_markers(lines, fps=25) == []
+
+
+def test_duplicate_shotid():
+    lines = [row(0, "A_010_0010"), row(10, "A_010_0020"), row(20, "A_010_0010")]
+    issues = validate_markers(lines, fps=25)
+    assert types(issues) == ["Duplicate ShotID"]
+    assert issues[0]["Row"] == 3
+    assert issues[0]["Details"] == "Used on rows 1, 3"
+
+
+def test_touching_intervals_do_not_overlap():
+    # [0,10) und [10,15) berühren sich nur
+    lines = [row(0, "A_010_0010", dur=10), row(10, "A_010_0020", dur=5)]
+    assert validate_markers(lines, fps=25) == []
+
+
+def test_nested_interval_overlaps():
+    lines = [row(0, "A_010_0010", dur=100), row(10, "A_010_0020", dur=5), row(50, "A_010_0030", dur=5)]
+    issues = validate_markers(lines, fps=25)
+    assert types(issues) == ["Overlap", "Overlap"]
+    # Beide inneren Marker werden gegen den umschließenden Marker gemeldet
+    assert all("row 1" in issue["Details"] for issue in issues)
+
+
+def test_out_of_order_timecode():
+    lines = [
+        ["user", "00:00:02:00", "", "Green", "A_010_0010", "", "", ""],
+        ["user", "00:00:01:00", "", "Green", "A_010_0020", "", "", ""],
+    ]
+    issues = validate_markers(lines, fps=25)
+    assert types(issues) == ["Out of order"]
+    assert issues[0]["Row"] == 2
+    assert "Frame 25 comes before frame 50" in issues[0]["Details"]
+
+
+def test_short_rows_and_rows_without_frame_range_are_ignored():
+    lines = [
+        ["user"],
+        ["user", "not a timecode", "", "Green", "A_010_0010"],
+        ["user", "", "", "Green", ""],
+        row(0, "A_010_0020"),
+    ]
+    assert validate_markers(lines, fps=25) == []
+
+
+def test_comments_before_first_group_are_not_duplicate_shotids():
+    original = [row(0, "fix"), row(10, "fix"), row(20, "010 - explosion"), row(30, "more")]
+    lines = [row(0, "fix"), row(10, "fix"), row(20, "A_010_0010"), row(30, "A_010_0020")]
+    assert validate_markers(lines, fps=25, groups=marker_groups(original)) == []
+    assert types(validate_markers(lines, fps=25)) == ["Duplicate ShotID"]
+
+
+def test_reappearing_group_code_does_not_duplicate_generated_shotids():
+    # assign_shotids zählt pro Gruppe weiter, auch wenn ein Gruppencode später wiederkehrt
+    original = [row(0, "010 - a"), row(10, "020 - b"), row(20, "010 - c")]
+    labeled = assign_shotids(original, "ABCDE", 10)
+    lines = build_preview_lines(original, labeled, "Green")
+    assert [line[4] for line in lines] == ["ABCDE_010_0010", "ABCDE_020_0010", "ABCDE_010_0020"]
+    assert validate_markers(lines, fps=25, groups=marker_groups(original)) == []
+
+
+def test_row_numbers_are_one_based():
+    lines = [row(10, "A_010_0010"), row(0, "A_010_0020")]
+    assert validate_markers(lines, fps=25)[0]["Row"] == 2